@@ -1,7 +1,9 @@
 """Boardgame discord bot."""
 
+import asyncio
 import datetime
 import logging
+import logging.handlers
 import os
 import pathlib
 import queue
@@ -9,6 +11,8 @@ import random
 import sys
 import typing
 
+import ahocorasick
+import aiohttp
 import discord
 import discord.app_commands
 import discord.ext.tasks
@@ -22,7 +26,6 @@ import utils
 # TODO: role / colour choosing command
 # TODO: automatically create event when poll closes
 # TODO: analysis and statistics command
-# TODO: fix calendar week bug
 # TODO: fix sunday 18:00 bug (if it even is one)
 # TODO: improve config validation
 # TODO: suggest board games command (BGG list?)
@@ -35,43 +38,116 @@ import utils
 __VERSION__ = 3, 13, 0
 """Bot version as Major.Minor.Patch (semantic versioning)."""
 
-# load environment variables
-dotenv.load_dotenv()
-TOKEN: str = typing.cast(str, os.environ.get("DISCORD_BOT_TOKEN"))
-OWNER: int = int(typing.cast(str, os.environ.get("OWNER_ID")))
-LOG_CHANNEL: int = int(typing.cast(str, os.environ.get("LOG_CHANNEL")))
+# environment variables; loaded in main()
+TOKEN: str
+OWNER: int
+LOG_CHANNEL: int
 
 # config values
 CONFIG_PATH: str = "config.json"
-CONFIG: models.Config = models.Config.model_validate_json(
-    pathlib.Path(CONFIG_PATH).read_text(encoding="utf-8"))
 LOG_PATH: str = "logs"
-LOG_FILE: pathlib.Path = pathlib.Path(
-    "/", LOG_PATH, f"log_{datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")}.log")
+DAY_NAMES: tuple[str, ...] = ("Montag", "Dienstag", "Mittwoch", "Donnerstag", "Freitag")
+# loaded in main() so importing this module doesn't do any I/O
+CONFIG: models.Config
+REACTION_AUTOMATON: ahocorasick.Automaton
 
 
 # bot setup
-intents: discord.Intents = discord.Intents.default()
-intents.message_content = True
-intents.members = True
-bot: discord.Client = discord.Client(intents=intents)
+# only what the bot uses: guild messages for reactions, emojis for the reactions themselves and
+# members for ascend/descend
+intents: discord.Intents = discord.Intents(guilds=True, guild_messages=True,
+                                           message_content=True, expressions=True, members=True)
+# no command works with cached messages
+bot: utils.BoardgameClient = utils.BoardgameClient(intents=intents, max_messages=None)
 tree: discord.app_commands.CommandTree = discord.app_commands.CommandTree(
     client=bot,
     allowed_installs=discord.app_commands.AppInstallationType(guild=True, user=False))
 
 # logging setup
-log_queue: queue.Queue[discord.Embed] = queue.Queue()
+# bounded so an unreachable log channel can't pile up records forever
+log_queue: asyncio.Queue[discord.Embed] = asyncio.Queue(maxsize=1000)
 logger: logging.Logger = logging.getLogger("discord")
-discord_handler: utils.DiscordHandler = utils.DiscordHandler(log_queue)
-discord_handler.setLevel(logging.INFO)
-logging.basicConfig(level=logging.DEBUG, datefmt="%Y-%m-%d %H:%M:%S", style="{",
-                    format="[{asctime}] [{levelname}] ({funcName}) {message}",
-                    handlers=[logging.FileHandler(LOG_FILE.resolve()),
-                              logging.StreamHandler(sys.stdout),
-                              discord_handler])
+
+
+# used for reactions and activities instead of the module-level functions' shared instance
+rng: random.Random = random.Random()
+# guild emojis by name per guild id; filled on first use, dropped when the emojis change
+guild_emojis: dict[int, dict[str, discord.Emoji]] = {}
+# background tasks that are still running; referenced so they aren't garbage collected
+pending_tasks: set[asyncio.Task[None]] = set()
+# limits the reactions being added at once so bursts don't run into rate limits
+reaction_semaphore: asyncio.Semaphore = asyncio.Semaphore(8)
 
 
 # handling errors
+ErrorHandler = typing.Callable[[discord.Interaction, discord.app_commands.AppCommandError],
+                               tuple[str, dict[str, typing.Any], typing.Callable[[str], str]]]
+
+
+def missing_permissions_error(interaction: discord.Interaction,
+                              error: discord.app_commands.AppCommandError) \
+        -> tuple[str, dict[str, typing.Any], typing.Callable[[str], str]]:
+    """Handle a user with missing permissions trying to use a command.
+
+    Arguments:
+        - interaction: the interaction being handled.
+        - error: the error being raised.
+
+    Returns:
+        The translation key, its format arguments and a function building the log message from
+        the mention of the command.
+    """
+    miss_perms: str = ", ".join(typing.cast(discord.app_commands.MissingPermissions,
+                                            error).missing_permissions)
+    return "error_perm", {"permissions": miss_perms}, lambda cmd_mention: (
+        f"{interaction.user.mention} tried to use command {cmd_mention} in "
+        f"<#{interaction.channel_id}> while missing the following permissions: {miss_perms}")
+
+
+def check_failure_error(interaction: discord.Interaction,
+                        _error: discord.app_commands.AppCommandError) \
+        -> tuple[str, dict[str, typing.Any], typing.Callable[[str], str]]:
+    """Handle a user that is not the owner trying to use a command.
+
+    Arguments:
+        - interaction: the interaction being handled.
+        - _error: the error being raised.
+
+    Returns:
+        The translation key, its format arguments and a function building the log message from
+        the mention of the command.
+    """
+    owner: int = OWNER
+    return "error_owner", {"OWNER": owner}, lambda cmd_mention: (
+        f"{interaction.user.mention} tried to use command {cmd_mention} in "
+        f"<#{interaction.channel_id}> despite not being <@{owner}>.")
+
+
+def generic_error(interaction: discord.Interaction,
+                  _error: discord.app_commands.AppCommandError) \
+        -> tuple[str, dict[str, typing.Any], typing.Callable[[str], str]]:
+    """Handle any other error.
+
+    Arguments:
+        - interaction: the interaction being handled.
+        - _error: the error being raised.
+
+    Returns:
+        The translation key, its format arguments and a function building the log message from
+        the mention of the command.
+    """
+    return "error", {"OWNER": OWNER}, lambda cmd_mention: (
+        f"Command {cmd_mention} was used by {interaction.user.mention} in "
+        f"<#{interaction.channel_id}>.")
+
+
+# looked up along the error's MRO, so subclasses are handled like with isinstance
+ERROR_HANDLERS: dict[type[Exception], ErrorHandler] = {
+    discord.app_commands.MissingPermissions: missing_permissions_error,
+    discord.app_commands.CheckFailure: check_failure_error
+}
+
+
 @tree.error
 async def on_error(interaction: discord.Interaction,
                    error: discord.app_commands.AppCommandError) -> None:
@@ -84,44 +160,26 @@ async def on_error(interaction: discord.Interaction,
     locale: str = interaction.locale.value
     send: typing.Callable = interaction.followup.send if interaction.response.is_done() \
         else interaction.response.send_message
-    # user with missing permissions tried to use command
-    if isinstance(error, discord.app_commands.MissingPermissions):
-        miss_perms: str = ", ".join(error.missing_permissions)
-        if interaction.command and interaction.data:
-            cmd_mention: str = f"</{interaction.command.name}:{interaction.data.get("id")}>"
-            logging.exception(msg=f"{interaction.user.mention} tried to use command {cmd_mention}"
-                              f" in <#{interaction.channel_id}> while missing the following"
-                              f"permissions: {miss_perms}", exc_info=error)
-        await send(utils.translate("error_perm", locale, permissions=miss_perms), ephemeral=True)
-    # user that is not owner tried to use command
-    elif isinstance(error, discord.app_commands.CheckFailure):
-        if interaction.command and interaction.data:
-            cmd_mention: str = f"</{interaction.command.name}:{interaction.data.get("id")}>"
-            logging.exception(msg=f"{interaction.user.mention} tried to use command {cmd_mention}"
-                              f" in <#{interaction.channel_id}> despite not being <@{OWNER}>.",
-                              exc_info=error)
-        await send(utils.translate("error_owner", locale, OWNER=OWNER), ephemeral=True)
-    # generic exception occurred
+    handler: ErrorHandler = next((ERROR_HANDLERS[cls] for cls in type(error).__mro__
+                                  if cls in ERROR_HANDLERS), generic_error)
+    key, format_kwargs, log_text = handler(interaction, error)
+    # the log message is only built if there is a command to mention
+    if interaction.command and interaction.data:
+        cmd_mention: str = f"</{interaction.command.name}:{interaction.data.get("id")}>"
+        logging.exception(msg=log_text(cmd_mention), exc_info=error)
     else:
-        if interaction.command and interaction.data:
-            cmd_mention: str = f"</{interaction.command.name}:{interaction.data.get("id")}>"
-            logging.exception(msg=f"Command {cmd_mention} was used by {interaction.user.mention}"
-                              f" in <#{interaction.channel_id}>.", exc_info=error)
-        else:
-            logging.exception(msg="An error occurred.", exc_info=error)
-        await send(utils.translate("error", locale, OWNER=OWNER), ephemeral=True)
+        logging.exception(msg="An error occurred.", exc_info=error)
+    await send(utils.translate(key, locale, **format_kwargs), ephemeral=True)
 
 
 # handling events
 @bot.event
 async def on_ready() -> None:
     """Do stuff on ready."""
-    if tree.translator is None:
-        await tree.set_translator(utils.BoardgameTranslator())
-    if not activity_task.is_running():
-        activity_task.start()
-    if not log_task.is_running():
-        log_task.start()
+    bot.log_channel = typing.cast(discord.TextChannel | None, bot.get_channel(LOG_CHANNEL))
+    task: asyncio.Task[None] = asyncio.create_task(prefetch_holidays())
+    pending_tasks.add(task)
+    task.add_done_callback(pending_tasks.discard)
     # called multiple times; not only when first started
     text: str = f"Bot running version {".".join(map(str, __VERSION__))}."
     logging.info(text)
@@ -134,46 +192,166 @@ async def on_message(message: discord.Message) -> None:
     Argumemts:
         - message: the actual message.
     """
+    # FIXME: Discord isn't behaving rational or predictable, so event creation on poll end
+    #        is postponed
+    # ignore bots (including this one), webhooks and messages without text
+    if message.author.bot or message.webhook_id is not None or not message.content:
+        return
+    if not message.guild or not CONFIG.reactions:
+        return
     reaction: models.Reaction
-    message_text: str = message.content.lower()
-    if message.guild:
-        for reaction in CONFIG.reactions:
-            if reaction.phrase in message_text:
-                emoji: discord.Emoji | None = discord.utils.get(
-                    message.guild.emojis, name=random.choice(reaction.guild_emojis))
-                utils.log_reaction(message, reaction)
-                if emoji:
-                    await message.add_reaction(emoji)
-                else:
-                    await message.add_reaction(reaction.fallback_emoji)
-        # FIXME: Discord isn't behaving rational or predictable, so event creation on poll end
-        #        is postponed
+    message_text: str = message.content.casefold()
+    for reaction in utils.find_reactions(REACTION_AUTOMATON, message_text):
+        # don't hold up event dispatch with the REST call
+        task: asyncio.Task[None] = asyncio.create_task(add_reaction(message, reaction))
+        pending_tasks.add(task)
+        task.add_done_callback(pending_tasks.discard)
+
+
+@bot.event
+async def on_guild_emojis_update(guild: discord.Guild, _before: typing.Sequence[discord.Emoji],
+                                 _after: typing.Sequence[discord.Emoji]) -> None:
+    """Do stuff on guild emojis changed.
+
+    Arguments:
+        - guild: the guild whose emojis changed.
+        - _before: the emojis before the change.
+        - _after: the emojis after the change.
+    """
+    guild_emojis.pop(guild.id, None)
+
+
+async def add_reaction(message: discord.Message, reaction: models.Reaction) -> None:
+    """Add a reaction to a message, preferring one of the guild emojis.
+
+    Arguments:
+        - message: the message to react to.
+        - reaction: the reaction.
+    """
+    guild: discord.Guild = typing.cast(discord.Guild, message.guild)
+    if (emojis := guild_emojis.get(guild.id)) is None:
+        # reversed so the first emoji wins if several share a name
+        emojis = guild_emojis[guild.id] = {emoji.name: emoji for emoji in reversed(guild.emojis)}
+    emoji: discord.Emoji | None = emojis.get(rng.choice(reaction.guild_emojis))
+    utils.log_reaction(message, reaction)
+    if reaction_semaphore.locked():
+        logging.warning(msg=f"Too many reactions in progress, reaction to {message.jump_url} "
+                        "has to wait.")
+    async with reaction_semaphore:
+        try:
+            if emoji:
+                await message.add_reaction(emoji)
+            else:
+                await message.add_reaction(reaction.fallback_emoji)
+        except discord.HTTPException as error:
+            logging.exception(msg=f"Could not react to {message.jump_url}.", exc_info=error)
+
+
+async def get_week_holidays(days: tuple[tuple[datetime.date, str, str], ...]) -> dict[str, str]:
+    """Get the holidays of all years a poll week touches.
+
+    Arguments:
+        - days: the days of the poll week as returned by utils.poll_days.
+
+    Returns:
+        Holidays with date and name.
+    """
+    # the week can span two years
+    holidays: dict[str, str] = {}
+    for year in {date.year for date, _, _ in days}:
+        holidays |= await utils.get_holidays(
+            typing.cast(aiohttp.ClientSession, bot.http_session), CONFIG.holiday_api_url, year)
+    return holidays
+
+
+async def prefetch_holidays() -> None:
+    """Fetch the holidays for next week's poll so /poll can use the cache."""
+    try:
+        await get_week_holidays(utils.poll_days(utils.next_monday(), DAY_NAMES))
+    # a malformed payload fails with KeyError or ValueError
+    except (aiohttp.ClientError, TimeoutError, KeyError, ValueError) as error:
+        logging.exception(msg="Could not prefetch holidays.", exc_info=error)
 
 
 # tasks
 @discord.ext.tasks.loop(minutes=30)
 async def activity_task() -> None:
     """Update activity."""
-    activity: discord.BaseActivity = discord.Game(
-        name=random.choice(CONFIG.games))
+    game: str = rng.choice(CONFIG.games)
+    # no need to send an update if the same game was chosen again
+    if getattr(bot.activity, "name", None) == game:
+        return
+    activity: discord.Game = discord.Game(name=game)
     utils.log_activity(activity)
     await bot.change_presence(activity=activity)
+    # change_presence doesn't remember the activity; this also keeps it across reconnects
+    bot.activity = activity
 
 
-@discord.ext.tasks.loop(seconds=10)
+async def send_logs(channel: discord.TextChannel, embeds: list[discord.Embed]) -> None:
+    """Send a batch of log embeds, dropping it if discord refuses it.
+
+    Arguments:
+        - channel: the log channel.
+        - embeds: the embeds to send.
+    """
+    try:
+        await channel.send(embeds=embeds)
+    except discord.HTTPException as error:
+        # debug stays out of the log channel, so a failing channel doesn't feed itself
+        logger.debug("Dropped %s log embeds: %s", len(embeds), error)
+
+
+@discord.ext.tasks.loop()
 async def log_task() -> None:
-    """Log records by actually sending them to the log channel on discord."""
-    log_channel: discord.TextChannel = typing.cast(discord.TextChannel,
-                                                   bot.get_channel(LOG_CHANNEL))
+    """Log records by actually sending them to the log channel on discord as they arrive."""
+    # the cache might not have been warm yet when the channel was resolved in on_ready
+    if bot.log_channel is None:
+        try:
+            bot.log_channel = typing.cast(discord.TextChannel | None,
+                                          bot.get_channel(LOG_CHANNEL)) \
+                or typing.cast(discord.TextChannel, await bot.fetch_channel(LOG_CHANNEL))
+        except discord.HTTPException as error:
+            # resolved before taking any records, so none are lost while retrying
+            logger.debug("Could not resolve the log channel: %s", error)
+            await asyncio.sleep(60)
+            return
+    log_channel: discord.TextChannel = bot.log_channel
+    # wait for the next record, then take whatever else has piled up in the meantime
+    embeds: list[discord.Embed] = [await log_queue.get()]
     while not log_queue.empty():
-        embed: discord.Embed = log_queue.get()
-        await log_channel.send(embed=embed)
+        embed: discord.Embed = log_queue.get_nowait()
+        # a message can hold up to 10 embeds with 6000 characters in total
+        if len(embeds) == 10 or sum(map(len, embeds)) + len(embed) > 6000:
+            await send_logs(log_channel, embeds)
+            embeds = []
+        embeds.append(embed)
+    await send_logs(log_channel, embeds)
+
+
+@activity_task.before_loop
+@log_task.before_loop
+async def wait_until_ready() -> None:
+    """Wait with the tasks until the bot is connected."""
+    await bot.wait_until_ready()
 
 
 # commands
+def is_owner(interaction: discord.Interaction) -> bool:
+    """Check if the user is the bot owner.
+
+    Arguments:
+        - interaction: the interaction being handled.
+
+    Returns:
+        True if owner, False otherwise.
+    """
+    return interaction.user.id == OWNER
+
+
 @tree.command(name="sync", description="sync_desc")
 @discord.app_commands.dm_only()
-@utils.check_if_owner(OWNER)
+@discord.app_commands.check(is_owner)
 async def sync(interaction: discord.Interaction) -> None:
     """Sync commands.
 
@@ -196,21 +374,21 @@ async def sync(interaction: discord.Interaction) -> None:
 @discord.app_commands.describe(role_id="ascend_role-id")
 @discord.app_commands.describe(user_id="ascend_user-id")
 @discord.app_commands.dm_only()
-@utils.check_if_owner(OWNER)
+@discord.app_commands.check(is_owner)
 async def ascend(interaction: discord.Interaction, server_id: str, role_id: str,
-                 user_id: str = str(OWNER)) -> None:
+                 user_id: typing.Optional[str] = None) -> None:
     """Ascend.
 
     Arguments:
         - interaction: the interaction being handled.
         - server_id: the ID of the server.
         - role_id: the ID of the role.
-        - user_id: the ID of the user.
+        - user_id: the ID of the user (default owner).
     """
     utils.log_command(interaction)
     locale: str = interaction.locale.value
     if (guild := bot.get_guild(int(server_id))) and (role := guild.get_role(int(role_id))) \
-            and (member := guild.get_member(int(user_id))):
+            and (member := guild.get_member(int(user_id) if user_id else OWNER)):
         await member.add_roles(role)
         await interaction.response.send_message(utils.translate(
             "ascend_success", locale, role=role.mention, member=member.mention), ephemeral=True)
@@ -224,21 +402,21 @@ async def ascend(interaction: discord.Interaction, server_id: str, role_id: str,
 @discord.app_commands.describe(role_id="descend_role-id")
 @discord.app_commands.describe(user_id="descend_user-id")
 @discord.app_commands.dm_only()
-@utils.check_if_owner(OWNER)
+@discord.app_commands.check(is_owner)
 async def descend(interaction: discord.Interaction, server_id: str, role_id: str,
-                  user_id: str = str(OWNER)) -> None:
+                  user_id: typing.Optional[str] = None) -> None:
     """Descend.
 
     Arguments:
         - interaction: the interaction being handled.
         - server_id: the ID of the server.
         - role_id: the ID of the role.
-        - user_id: the ID of the user.
+        - user_id: the ID of the user (default owner).
     """
     utils.log_command(interaction)
     locale: str = interaction.locale.value
     if (guild := bot.get_guild(int(server_id))) and (role := guild.get_role(int(role_id))) \
-            and (member := guild.get_member(int(user_id))):
+            and (member := guild.get_member(int(user_id) if user_id else OWNER)):
         await member.remove_roles(role)
         await interaction.response.send_message(utils.translate(
             "descend_success", locale, role=role.mention, member=member.mention), ephemeral=True)
@@ -261,25 +439,24 @@ async def create_poll(interaction: discord.Interaction, hours: typing.Optional[i
     utils.log_command(interaction)
     await interaction.response.defer()
     # poll setup
-    today: datetime.date = datetime.date.today()
+    now: datetime.datetime = datetime.datetime.now()
+    today: datetime.date = now.date()
     duration: datetime.timedelta
     if hours and 0 < hours <= 768:
         duration = datetime.timedelta(hours=hours)
     else:
-        duration = utils.next_sunday_1800(today) - datetime.datetime.now()
-    kw: int = datetime.datetime.now().isocalendar().week + 1
+        duration = utils.next_sunday_1800(today) - now
     monday: datetime.date = utils.next_monday(today)
-    holidays: dict[str, str] = utils.get_holidays(CONFIG.holiday_api_url)
-    day_names: list[str] = ["Montag", "Dienstag",
-                            "Mittwoch", "Donnerstag", "Freitag"]
+    # the week of the monday itself; adding one to this week's number breaks at new year
+    kw: int = monday.isocalendar().week
+    days: tuple[tuple[datetime.date, str, str], ...] = utils.poll_days(monday, DAY_NAMES)
+    holidays: dict[str, str] = await get_week_holidays(days)
     # create actual poll
     poll: discord.Poll = discord.Poll(question=CONFIG.question_text.format_map({"kw": kw}),
                                       duration=duration, multiple=True)
-    for i in range(5):
-        date: datetime.date = monday + datetime.timedelta(i)
-        poll_text: str = f"{day_names[i]}, {date.strftime("%d.%m.")}"
-        if date.isoformat() in holidays:
-            poll_text += f" ({holidays[date.isoformat()]})"
+    for _, iso_date, poll_text in days:
+        if (holiday := holidays.get(iso_date)) is not None:
+            poll_text += f" ({holiday})"
         poll.add_answer(text=poll_text)
     await interaction.followup.send(poll=poll)
 
@@ -299,7 +476,7 @@ async def send_message(interaction: discord.Interaction) -> None:
     label: str = utils.translate("msg_label", locale)
     channel: discord.TextChannel = typing.cast(discord.TextChannel,
                                                interaction.channel)
-    await interaction.response.send_modal(ui.MessageModal(title, label, OWNER, channel))
+    await interaction.response.send_modal(ui.MessageModal(title, label, OWNER, locale, channel))
 
 
 # context menu commands
@@ -315,17 +492,32 @@ async def react(interaction: discord.Interaction, message: discord.Message) -> N
     """
     utils.log_command(interaction)
     locale: str = interaction.locale.value
-    emojis: list[str | discord.Emoji | discord.PartialEmoji] = []
     await interaction.response.defer(ephemeral=True)
-    for reaction in message.reactions:
-        if interaction.user in [user async for user in reaction.users()]:
-            emojis.append(reaction.emoji)
-            await message.add_reaction(reaction.emoji)
+    # check all reactions at once instead of paginating through them one after another
+    reacted: list[bool] = await asyncio.gather(*(
+        utils.user_reacted(reaction, interaction.user.id) for reaction in message.reactions))
+    reactions: list[discord.Reaction] = [
+        reaction for reaction, user_reacted in zip(message.reactions, reacted) if user_reacted]
+    # no need to add reactions the bot has already added
+    missing: list[str | discord.Emoji | discord.PartialEmoji] = [
+        reaction.emoji for reaction in reactions if not reaction.me]
+    # one failed reaction shouldn't keep the others from being added
+    results: list[None | BaseException] = await asyncio.gather(
+        *map(message.add_reaction, missing), return_exceptions=True)
+    failed: set[str] = set()
+    for emoji, result in zip(missing, results):
+        if isinstance(result, BaseException):
+            failed.add(str(emoji))
+            logging.exception(msg=f"Could not add reaction {emoji} to {message.jump_url}.",
+                              exc_info=result)
+    emojis: list[str | discord.Emoji | discord.PartialEmoji] = [
+        reaction.emoji for reaction in reactions if str(reaction.emoji) not in failed]
     if len(emojis) > 0:
         await interaction.followup.send(utils.translate("react_success", locale,
                                         reactions=", ".join(map(str, emojis))), ephemeral=True)
     else:
-        await interaction.followup.send(utils.translate("react_fail", locale), ephemeral=True)
+        await interaction.followup.send(utils.translate("react_fail", locale),
+                                        ephemeral=True)
 
 
 @tree.context_menu(name="respond")
@@ -342,7 +534,8 @@ async def respond(interaction: discord.Interaction, message: discord.Message) ->
     locale: str = interaction.locale.value
     title: str = utils.translate("respond_title", locale)
     label: str = utils.translate("respond_label", locale)
-    await interaction.response.send_modal(ui.ResponseModal(title, label, OWNER, message))
+    await interaction.response.send_modal(ui.ResponseModal(title, label, OWNER, locale,
+                                                           message))
 
 
 @tree.context_menu(name="close")
@@ -463,5 +656,47 @@ async def modview(interaction: discord.Interaction, member: discord.Member) -> N
                                             roles_embed, account_embed], ephemeral=True)
 
 
+async def main() -> None:
+    """Load the environment and config, set up logging and run the bot."""
+    global TOKEN, OWNER, LOG_CHANNEL, CONFIG, REACTION_AUTOMATON  # pylint:disable=global-statement
+    await asyncio.to_thread(dotenv.load_dotenv)
+    TOKEN = typing.cast(str, os.environ.get("DISCORD_BOT_TOKEN"))
+    OWNER = int(typing.cast(str, os.environ.get("OWNER_ID")))
+    LOG_CHANNEL = int(typing.cast(str, os.environ.get("LOG_CHANNEL")))
+    CONFIG = await asyncio.to_thread(utils.load_config, CONFIG_PATH)
+    REACTION_AUTOMATON = utils.build_automaton(CONFIG.reactions)
+    # so the first command doesn't have to wait for the language files
+    await asyncio.to_thread(utils.get_languages)
+    log_file: pathlib.Path = pathlib.Path(
+        "/", LOG_PATH, f"log_{datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")}.log")
+    file_handler: logging.FileHandler = await asyncio.to_thread(logging.FileHandler,
+                                                                log_file.resolve())
+    stream_handler: logging.StreamHandler = logging.StreamHandler(sys.stdout)
+    formatter: logging.Formatter = logging.Formatter(
+        fmt="[{asctime}] [{levelname}] ({funcName}) {message}", datefmt="%Y-%m-%d %H:%M:%S",
+        style="{")
+    file_handler.setFormatter(formatter)
+    stream_handler.setFormatter(formatter)
+    discord_handler: utils.DiscordHandler = utils.DiscordHandler(log_queue,
+                                                                 asyncio.get_running_loop())
+    discord_handler.setLevel(logging.INFO)
+    # the actual handlers run on the listener's thread so logging never blocks the event loop
+    listener: logging.handlers.QueueListener = logging.handlers.QueueListener(
+        queue.Queue(), file_handler, stream_handler, discord_handler,
+        respect_handler_level=True)
+    logging.basicConfig(level=logging.DEBUG,
+                        handlers=[utils.LocalQueueHandler(listener.queue)])
+    listener.start()
+    try:
+        async with bot:
+            # one-time setup; on_ready is called again on every reconnect
+            await tree.set_translator(utils.BoardgameTranslator())
+            activity_task.start()
+            log_task.start()
+            await bot.start(token=TOKEN)
+    finally:
+        listener.stop()
+
+
 if __name__ == "__main__":
-    bot.run(token=TOKEN, log_handler=None)
+    asyncio.run(main())
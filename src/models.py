@@ -5,15 +5,17 @@ import pydantic
 
 class Reaction(pydantic.BaseModel):
     """Reaction model."""
+    model_config = pydantic.ConfigDict(frozen=True, extra="forbid")
     phrase: str
-    guild_emojis: list[str]
+    guild_emojis: tuple[str, ...]
     fallback_emoji: str
 
 
 class Config(pydantic.BaseModel):
     """Config model."""
+    model_config = pydantic.ConfigDict(frozen=True, extra="forbid")
     fallback_lang: str
     holiday_api_url: str
     question_text: str
-    games: list[str]
-    reactions: list[Reaction]
+    games: tuple[str, ...]
+    reactions: tuple[Reaction, ...]
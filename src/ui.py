@@ -20,7 +20,8 @@ class TextModal(discord.ui.Modal):
         """
         super().__init__(title=title)
         self.owner: int = owner
-        self.add_item(discord.ui.TextInput(label=label))
+        self.text_input: discord.ui.TextInput = discord.ui.TextInput(label=label)
+        self.add_item(self.text_input)
 
     async def on_error(self, interaction: discord.Interaction, error: Exception) \
             -> None:  # pylint:disable=arguments-differ
@@ -31,24 +32,29 @@ class TextModal(discord.ui.Modal):
             - error: the error that occurred.
         """
         locale: str = interaction.locale.value
-        await interaction.response.send_message(utils.translate("error", locale, error=error,
-                                                                OWNER=self.owner), ephemeral=True)
+        # the response might already have been sent alongside the failed message
+        send: typing.Callable = interaction.followup.send if interaction.response.is_done() \
+            else interaction.response.send_message
+        await send(utils.translate("error", locale, error=error, OWNER=self.owner), ephemeral=True)
 
 
 class ResponseModal(TextModal):
     """Response modal."""
 
-    def __init__(self, title: str, label: str, owner: int, message: discord.Message) -> None:
+    def __init__(self, title: str, label: str, owner: int, locale: str,
+                 message: discord.Message) -> None:
         """Initialise the modal.
 
         Arguments:
             - title: modal title.
             - label: text input label.
             - owner: the user id of the owner.
+            - locale: the locale of the user opening the modal.
             - message: message to respond to.
         """
         super().__init__(title, label, owner)
         self.message: discord.Message = message
+        self.submit_template: str = utils.translate_template("respond_submit", locale)
 
     async def on_submit(self, interaction: discord.Interaction) \
             -> None:  # pylint:disable=arguments-differ
@@ -57,27 +63,29 @@ class ResponseModal(TextModal):
         Arguments:
             - interaction: the interaction being handled.
         """
-        locale: str = interaction.locale.value
-        text: str = typing.cast(discord.ui.TextInput, self.children[0]).value
+        text: str = self.text_input.value
         await self.message.reply(text)
-        await interaction.response.send_message(utils.translate("respond_submit", locale,
-                                                                text=text), ephemeral=True)
+        await interaction.response.send_message(self.submit_template.format_map({"text": text}),
+                                                ephemeral=True)
 
 
 class MessageModal(TextModal):
     """Message modal."""
 
-    def __init__(self, title: str, label: str, owner: int, channel: discord.TextChannel) -> None:
+    def __init__(self, title: str, label: str, owner: int, locale: str,
+                 channel: discord.TextChannel) -> None:
         """Initialise the modal.
 
         Arguments:
             - title: modal title.
             - label: text input label.
             - owner: the user id of the owner.
+            - locale: the locale of the user opening the modal.
             - channel: the channel to message.
         """
         super().__init__(title, label, owner)
         self.channel: discord.TextChannel = channel
+        self.submit_template: str = utils.translate_template("msg_submit", locale)
 
     async def on_submit(self, interaction: discord.Interaction) \
             -> None:  # pylint:disable=arguments-differ
@@ -86,8 +94,7 @@ class MessageModal(TextModal):
         Arguments:
             - interaction: the interaction being handled.
         """
-        locale: str = interaction.locale.value
-        text: str = typing.cast(discord.ui.TextInput, self.children[0]).value
+        text: str = self.text_input.value
         await self.channel.send(text)
-        await interaction.response.send_message(utils.translate("msg_submit", locale,
-                                                                text=text), ephemeral=True)
+        await interaction.response.send_message(self.submit_template.format_map({"text": text}),
+                                                ephemeral=True)
@@ -1,20 +1,25 @@
 """Utility stuff."""
 
+import asyncio
 import datetime
-import types
+import functools
 import json
 import logging
+import logging.handlers
 import pathlib
-import queue
+import sys
+import time
 import typing
 
+import ahocorasick
+import aiohttp
 import discord
-import requests
 
 import models
 
 
 LANG_PATH: str = "path"
+FALLBACK_LOCALE: str = "en-GB"
 COMMAND: int = 21
 REACTION: int = 22
 ACTIVITY: int = 23
@@ -38,22 +43,122 @@ LOG_LEVEL_EMOJIS: dict[int, str] = {
     logging.ERROR: "https://cdn.discordapp.com/emojis/1387999720831455403.webp",
     logging.CRITICAL: "https://cdn.discordapp.com/emojis/1387999722144403637.webp"
 }
+TIME_1800: datetime.time = datetime.time(18)
+LANG_CACHE: dict[str, dict[str, str]] | None = None
+LANG_KEYS: frozenset[str] = frozenset()
+HOLIDAY_CACHE_TTL: float = 24 * 60 * 60
+HOLIDAY_CACHE: dict[tuple[str, int], tuple[float, dict[str, str]]] = {}
+# indexed by level, filled from the colours and emojis above
+LOG_LEVEL_META: list[tuple[discord.Colour, str] | None] = [
+    (LOG_LEVEL_COLOURS[level], LOG_LEVEL_EMOJIS[level]) if level in LOG_LEVEL_COLOURS else None
+    for level in range(logging.CRITICAL + 1)]
+LOG_LEVEL_DEFAULT_META: tuple[discord.Colour, str] = (
+    LOG_LEVEL_COLOURS[logging.INFO], LOG_LEVEL_EMOJIS[logging.INFO])
+EMBED_FIELD_LIMIT: int = 1024
+LOG_FORMATTER: logging.Formatter = logging.Formatter()
+logger: logging.Logger = logging.getLogger(__name__)
 logging.addLevelName(COMMAND, "COMMAND")
 logging.addLevelName(REACTION, "REACTION")
 logging.addLevelName(ACTIVITY, "ACTIVITY")
 
 
+def build_log_embed(record: logging.LogRecord, colour: discord.Colour, icon_url: str,
+                    description: str) -> discord.Embed:
+    """Build the embed shared by all log records.
+
+    Arguments:
+        - record: the record to log.
+        - colour: the colour of the embed.
+        - icon_url: the icon of the log level.
+        - description: the description of the embed.
+
+    Returns:
+        The embed.
+    """
+    embed: discord.Embed = discord.Embed(
+        colour=colour, title=record.funcName, description=description,
+        timestamp=datetime.datetime.fromtimestamp(record.created, tz=datetime.timezone.utc))
+    embed.set_author(name=record.levelname, icon_url=icon_url)
+    return embed
+
+
+def build_command_embed(record: logging.LogRecord, colour: discord.Colour,
+                        icon_url: str) -> discord.Embed:
+    """Build the embed of a command or reaction record, shown as text.
+
+    Arguments:
+        - record: the record to log.
+        - colour: the colour of the embed.
+        - icon_url: the icon of the log level.
+
+    Returns:
+        The embed.
+    """
+    return build_log_embed(record, colour, icon_url, record.message)
+
+
+def build_error_embed(record: logging.LogRecord, colour: discord.Colour,
+                      icon_url: str) -> discord.Embed:
+    """Build the embed of an error record, shown as text with the exception attached.
+
+    Arguments:
+        - record: the record to log.
+        - colour: the colour of the embed.
+        - icon_url: the icon of the log level.
+
+    Returns:
+        The embed.
+    """
+    embed: discord.Embed = build_log_embed(record, colour, icon_url, record.message)
+    if record.exc_info:
+        # cached on the record like logging.Formatter does, so other handlers reuse it
+        if not record.exc_text:
+            record.exc_text = LOG_FORMATTER.formatException(record.exc_info)
+        embed.add_field(name="Exception", value=f"```{record.exc_info[0]}```")
+        # keep the end of the traceback, where the error is, within the field limit
+        embed.add_field(name="Traceback",
+                        value=f"```{record.exc_text[-(EMBED_FIELD_LIMIT - 6):]}```")
+    return embed
+
+
+def build_default_embed(record: logging.LogRecord, colour: discord.Colour,
+                        icon_url: str) -> discord.Embed:
+    """Build the embed of any other record, shown as code.
+
+    Arguments:
+        - record: the record to log.
+        - colour: the colour of the embed.
+        - icon_url: the icon of the log level.
+
+    Returns:
+        The embed.
+    """
+    return build_log_embed(record, colour, icon_url, f"```{record.message}```")
+
+
+EmbedBuilder = typing.Callable[[logging.LogRecord, discord.Colour, str], discord.Embed]
+EMBED_BUILDERS: dict[int, EmbedBuilder] = {
+    COMMAND: build_command_embed,
+    REACTION: build_command_embed,
+    logging.ERROR: build_error_embed,
+    logging.CRITICAL: build_error_embed
+}
+
+
 class DiscordHandler(logging.Handler):
     """Discord logging handler."""
 
-    def __init__(self, log_queue: queue.Queue[discord.Embed]) -> None:
+    def __init__(self, log_queue: asyncio.Queue[discord.Embed],
+                 loop: asyncio.AbstractEventLoop) -> None:
         """Initialise the handler.
 
         Arguments:
             - log_queue: the queue to send logs to.
+            - loop: the event loop the queue belongs to.
         """
         super().__init__()
-        self.log_queue: queue.Queue[discord.Embed] = log_queue
+        self.log_queue: asyncio.Queue[discord.Embed] = log_queue
+        self.loop: asyncio.AbstractEventLoop = loop
 
     def emit(self, record: logging.LogRecord) -> None:
         """Log the record by adding it to the queue.
@@ -61,40 +166,98 @@ class DiscordHandler(logging.Handler):
         Arguments:
             - record: the record to log.
         """
-        embed: discord.Embed
-        match record.levelno:
-            case 21 | 22:  # COMMAND, REACTION
-                embed = discord.Embed(colour=LOG_LEVEL_COLOURS[record.levelno],
-                                      title=record.funcName,
-                                      description=record.message,
-                                      timestamp=datetime.datetime.fromtimestamp(record.created))
-                embed.set_author(name=record.levelname,
-                                 icon_url=LOG_LEVEL_EMOJIS[record.levelno])
-            case logging.ERROR | logging.CRITICAL:  # ERROR, CRITICAL
-                error: tuple[type[Exception], Exception,
-                             types.TracebackType] = record.exc_info  # type: ignore
-                embed = discord.Embed(colour=LOG_LEVEL_COLOURS[record.levelno],
-                                      title=record.funcName,
-                                      description=record.message,
-                                      timestamp=datetime.datetime.fromtimestamp(record.created))
-                embed.set_author(name=record.levelname,
-                                 icon_url=LOG_LEVEL_EMOJIS[record.levelno])
-                embed.add_field(name="Exception", value=f"```{error[0]}```")
-                embed.add_field(name="Traceback",
-                                value=f"```{error[1].with_traceback(error[2])}```")
-            case _:  # INFO, WARNING, REACTION, DEBUG (below log level)
-                embed = discord.Embed(colour=LOG_LEVEL_COLOURS[record.levelno],
-                                      title=record.funcName,
-                                      description=f"```{record.message}```",
-                                      timestamp=datetime.datetime.fromtimestamp(record.created))
-                embed.set_author(name=record.levelname,
-                                 icon_url=LOG_LEVEL_EMOJIS[record.levelno])
-        self.log_queue.put(embed)
+        # an exception escaping here would end the queue listener's thread and all logging
+        try:
+            builder: EmbedBuilder = EMBED_BUILDERS.get(record.levelno, build_default_embed)
+            # custom levels without a colour and icon of their own look like info
+            meta: tuple[discord.Colour, str] | None = LOG_LEVEL_META[record.levelno] \
+                if 0 <= record.levelno < len(LOG_LEVEL_META) else None
+            embed: discord.Embed = builder(record, *(meta or LOG_LEVEL_DEFAULT_META))
+            # the handler runs on the queue listener's thread, the queue lives on the event loop
+            self.loop.call_soon_threadsafe(self.enqueue, embed)
+        except Exception:  # pylint:disable=broad-exception-caught
+            self.handleError(record)
+
+    def enqueue(self, embed: discord.Embed) -> None:
+        """Add the embed to the queue without waiting. If the queue is full, the oldest embed is
+        dropped.
+
+        Arguments:
+            - embed: the embed to add.
+        """
+        try:
+            self.log_queue.put_nowait(embed)
+        except asyncio.QueueFull:
+            try:
+                self.log_queue.get_nowait()
+                self.log_queue.put_nowait(embed)
+            except (asyncio.QueueEmpty, asyncio.QueueFull):
+                pass
+
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler for a listener in the same process."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Prepare the record for the queue. Unlike the default implementation, this keeps the
+        exception info since the record is never pickled.
+
+        Arguments:
+            - record: the record to prepare.
+
+        Returns:
+            The record with its message merged.
+        """
+        # merged here so the listener's handlers neither format it again nor touch the arguments
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        return record
+
+
+class BoardgameClient(discord.Client):
+    """Boardgame client."""
+
+    def __init__(self, *, intents: discord.Intents, **options: typing.Any) -> None:
+        """Initialise the client.
+
+        Arguments:
+            - intents: the gateway intents to use.
+            - options: additional client options.
+        """
+        super().__init__(intents=intents, **options)
+        self.http_session: aiohttp.ClientSession | None = None
+        # resolved in on_ready, or by the log task if the cache wasn't warm yet
+        self.log_channel: discord.TextChannel | None = None
+
+    async def setup_hook(self) -> None:
+        """Create the HTTP session shared by all outbound requests."""
+        # keeps connections (and cached DNS lookups) alive between requests
+        self.http_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=10),
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300, keepalive_timeout=60))
+
+    async def close(self) -> None:
+        """Close the HTTP session and the client."""
+        if self.http_session is not None:
+            await self.http_session.close()
+        await super().close()
 
 
 class BoardgameTranslator(discord.app_commands.Translator):
     """Boardgame translator."""
 
+    def __init__(self) -> None:
+        """Initialise the translator."""
+        self.lang_maps: dict[str, dict[str, str]] = {}
+
+    async def load(self) -> None:
+        """Load all language files once, filling in missing keys from the fallback locale."""
+        lang_maps: dict[str, dict[str, str]] = await asyncio.to_thread(get_languages)
+        fallback: dict[str, str] = lang_maps.get(FALLBACK_LOCALE, {})
+        self.lang_maps = {locale: fallback | lang for locale, lang in lang_maps.items()}
+        self.lang_maps.setdefault(FALLBACK_LOCALE, fallback)
+
     async def translate(self, string: discord.app_commands.locale_str, locale: discord.Locale,
                         context: discord.app_commands.TranslationContext | None) -> str | None:
         """Translate the string to the given locale.
@@ -105,9 +268,11 @@ class BoardgameTranslator(discord.app_commands.Translator):
             - context: additional translation context.
 
         Returns:
-            Translated string if locale exists, None otherwise.
+            Translated string if the key exists in the locale or the fallback, None otherwise.
         """
-        return translate(string.message, locale.value)
+        lang: dict[str, str] = self.lang_maps.get(locale.value, self.lang_maps[FALLBACK_LOCALE])
+        # None tells discord.py to keep the default string
+        return lang.get(string.message)
 
 
 def log_command(interaction: discord.Interaction) -> None:
@@ -118,8 +283,8 @@ def log_command(interaction: discord.Interaction) -> None:
     """
     if interaction.command and interaction.data:
         cmd_mention: str = f"</{interaction.command.name}:{interaction.data.get("id")}>"
-        logging.log(stacklevel=2, level=COMMAND, msg=f"Command {cmd_mention} was used by "
-                    f"{interaction.user.mention} in <#{interaction.channel_id}>.")
+        logger.log(COMMAND, "Command %s was used by %s in <#%s>.", cmd_mention,
+                   interaction.user.mention, interaction.channel_id, stacklevel=2)
 
 
 def log_reaction(message: discord.Message, reaction: models.Reaction) -> None:
@@ -129,9 +294,9 @@ def log_reaction(message: discord.Message, reaction: models.Reaction) -> None:
         - message: the message being reacted to.
         - reaction: the reaction.
     """
-    logging.log(stacklevel=2, level=REACTION, msg=f"Message by {message.author.mention} in "
-                f"<#{message.channel.id}> contained phrase '{reaction.phrase}'. The following "
-                f"reaction was added: {reaction.fallback_emoji}.")
+    logger.log(REACTION, "Message by %s in <#%s> contained phrase '%s'. The following reaction "
+               "was added: %s.", message.author.mention, message.channel.id, reaction.phrase,
+               reaction.fallback_emoji, stacklevel=2)
 
 
 def log_activity(activity: discord.BaseActivity) -> None:
@@ -140,24 +305,90 @@ def log_activity(activity: discord.BaseActivity) -> None:
     Arguments:
         - activity: the new activity.
     """
-    logging.log(stacklevel=2, level=ACTIVITY,
-                msg=f"Changed activity to {activity}.")
+    logger.log(ACTIVITY, "Changed activity to %s.", activity, stacklevel=2)
 
 
-def get_holidays(url: str) -> dict[str, str]:
-    """Get all holidays for Bavaria.
+async def get_holidays(session: aiohttp.ClientSession, url: str, year: int) -> dict[str, str]:
+    """Get all holidays for Bavaria in the given year. Responses are cached for a day; if the api
+    can't be reached afterwards, the outdated response is used.
 
     Arguments:
+        - session: the HTTP session to use.
         - url: the url of the holiday api.
+        - year: the year to get the holidays of.
 
     Returns:
         Holidays with date and name.
     """
-    data: dict[str, dict[str, str]] = requests.get(url=url, timeout=10).json()
-    return {v["datum"]: k for k, v in data.items()}
+    if (cached := HOLIDAY_CACHE.get((url, year))) is not None \
+            and time.monotonic() - cached[0] < HOLIDAY_CACHE_TTL:
+        return cached[1]
+    try:
+        async with session.get(url=url, params={"jahr": year}) as response:
+            response.raise_for_status()
+            data: dict[str, dict[str, str]] = await response.json()
+    except (aiohttp.ClientError, TimeoutError) as error:
+        if cached is None:
+            raise
+        logger.warning("Could not update holidays for %s, using cached ones: %s", year, error)
+        return cached[1]
+    holidays: dict[str, str] = {v["datum"]: k for k, v in data.items()}
+    HOLIDAY_CACHE[(url, year)] = time.monotonic(), holidays
+    return holidays
+
+
+def build_automaton(reactions: tuple[models.Reaction, ...]) -> ahocorasick.Automaton:
+    """Build an Aho-Corasick automaton matching the phrases of all reactions at once.
+
+    Arguments:
+        - reactions: the reactions.
+
+    Returns:
+        Automaton mapping each casefolded phrase to its reactions and their config positions.
+    """
+    automaton: ahocorasick.Automaton = ahocorasick.Automaton()
+    for index, reaction in enumerate(reactions):
+        phrase: str = reaction.phrase.casefold()
+        automaton.add_word(phrase, automaton.get(phrase, []) + [(index, reaction)])
+    automaton.make_automaton()
+    return automaton
+
+
+def find_reactions(automaton: ahocorasick.Automaton, text: str) -> list[models.Reaction]:
+    """Find all reactions whose phrase occurs in the text.
+
+    Arguments:
+        - automaton: the automaton built from the reactions.
+        - text: the casefolded text to search.
+
+    Returns:
+        The matching reactions in config order, each at most once.
+    """
+    # an automaton without any phrases can't be searched
+    if automaton.kind != ahocorasick.AHOCORASICK:
+        return []
+    matches: dict[int, models.Reaction] = {
+        index: reaction for _, found in automaton.iter(text) for index, reaction in found}
+    return [matches[index] for index in sorted(matches)]
+
 
+async def user_reacted(reaction: discord.Reaction, user_id: int) -> bool:
+    """Check if the user added the reaction. Stops paginating as soon as the user is found.
 
-def next_sunday_1800(date: datetime.date) -> datetime.datetime:
+    Arguments:
+        - reaction: the reaction.
+        - user_id: the ID of the user.
+
+    Returns:
+        True if the user reacted, False otherwise.
+    """
+    async for user in reaction.users():
+        if user.id == user_id:
+            return True
+    return False
+
+
+def next_sunday_1800(date: datetime.date | None = None) -> datetime.datetime:
     """Get next sunday 18:00 as datetime.datetime object.
 
     Arguments:
@@ -166,11 +397,13 @@ def next_sunday_1800(date: datetime.date) -> datetime.datetime:
     Returns:
         Next sunday 18:00.
     """
+    if date is None:
+        date = datetime.date.today()
     return datetime.datetime.combine(date + datetime.timedelta(days=6 - date.weekday()),
-                                     datetime.time(18))
+                                     TIME_1800)
 
 
-def next_monday(date: datetime.date) -> datetime.date:
+def next_monday(date: datetime.date | None = None) -> datetime.date:
     """Get next monday as datetime.date object.
 
     Arguments:
@@ -179,22 +412,39 @@ def next_monday(date: datetime.date) -> datetime.date:
     Returns:
         Next monday.
     """
+    if date is None:
+        date = datetime.date.today()
     return date + datetime.timedelta(days=7 - date.weekday())
 
 
-def check_if_owner(owner_id: int):
-    """Check if the user is the bot owner."""
-    def predicate(interaction: discord.Interaction) -> bool:
-        """Predicate to check if the user is the bot owner.
+@functools.lru_cache(maxsize=4)
+def poll_days(monday: datetime.date, day_names: tuple[str, ...]) \
+        -> tuple[tuple[datetime.date, str, str], ...]:
+    """Get the days of the week starting on monday with their poll answer text.
 
-        Arguments:
-            - interaction: the interaction being handled.
+    Arguments:
+        - monday: the first day of the week.
+        - day_names: the names of the days to include, starting with monday.
 
-        Returns:
-            True if owner, False otherwise.
-        """
-        return interaction.user.id == owner_id
-    return discord.app_commands.check(predicate)
+    Returns:
+        Date, ISO date and answer text (without holiday) of each day.
+    """
+    dates: list[datetime.date] = [monday + datetime.timedelta(i) for i in range(len(day_names))]
+    return tuple((date, date.isoformat(), f"{day_name}, {date.strftime("%d.%m.")}")
+                 for day_name, date in zip(day_names, dates))
+
+
+def load_config(path: str) -> models.Config:
+    """Load and validate the config file.
+
+    Arguments:
+        - path: the path of the config file.
+
+    Returns:
+        The config.
+    """
+    # pydantic parses the raw bytes itself, no need to decode them first
+    return models.Config.model_validate_json(pathlib.Path(path).read_bytes())
 
 
 def load_languages() -> dict[str, dict[str, str]]:
@@ -204,30 +454,69 @@ def load_languages() -> dict[str, dict[str, str]]:
         The loaded language maps.
     """
     lang_maps: dict[str, dict[str, str]] = {}
-    for file in pathlib.Path("lang").iterdir():
-        lang_maps[file.name.removesuffix(".json")] = json.loads(
-            file.read_text(encoding="utf-8"))
+    for file in pathlib.Path("lang").glob("*.json"):
+        # json detects the UTF-8 encoding of the raw bytes itself
+        lang: dict[str, str] = json.loads(file.read_bytes())
+        # interned, so lookups with literal keys and known locales match by identity
+        lang_maps[sys.intern(file.stem)] = {sys.intern(key): text for key, text in lang.items()}
     return lang_maps
 
 
-def translate(key: str, locale: str, **format_kwargs: typing.Any) -> str:
-    """Get text for key in given locale and optionally format with values.
+def get_languages() -> dict[str, dict[str, str]]:
+    """Get all language maps, loading the language files on first use.
+
+    Returns:
+        The loaded language maps.
+    """
+    if LANG_CACHE is None:
+        reload_languages()
+    return typing.cast(dict[str, dict[str, str]], LANG_CACHE)
+
+
+def reload_languages() -> None:
+    """Reload the language files, e.g. after editing them while the bot is running."""
+    global LANG_CACHE, LANG_KEYS  # pylint:disable=global-statement
+    LANG_CACHE = load_languages()
+    LANG_KEYS = frozenset(key for lang in LANG_CACHE.values() for key in lang)
+    translate_template.cache_clear()
+
+
+@functools.lru_cache(maxsize=512)
+def translate_template(key: str, locale: str) -> str:
+    """Get the unformatted text for key in given locale.
 
     Arguments:
         - key: the translation key.
         - locale: the locale to translate to.
-        - format_kwargs: the keyword arguments for formatting.
 
     Returns:
-        The translated and formatted text.
+        The translated text.
     """
-    # we hot load the language files
-    lang_maps: dict[str, dict[str, str]] = load_languages()
+    lang_maps: dict[str, dict[str, str]] = get_languages()
+    # no language has the key, so don't bother looking
+    if key not in LANG_KEYS:
+        return key
     # try and translate with given locale
     if (lang := lang_maps.get(locale)) is not None and lang.get(key) is not None:
-        return lang[key].format_map(format_kwargs)
+        return lang[key]
     # fallback to default locale
-    if (lang := lang_maps.get("en-GB")) is not None and lang.get(key) is not None:
-        return lang[key].format_map(format_kwargs)
+    if (lang := lang_maps.get(FALLBACK_LOCALE)) is not None and lang.get(key) is not None:
+        return lang[key]
     # fail; shouldn't ever happen
     return key
+
+
+def translate(key: str, locale: str, **format_kwargs: typing.Any) -> str:
+    """Get text for key in given locale and optionally format with values.
+
+    Arguments:
+        - key: the translation key.
+        - locale: the locale to translate to.
+        - format_kwargs: the keyword arguments for formatting.
+
+    Returns:
+        The translated and formatted text.
+    """
+    template: str = translate_template(key, sys.intern(locale))
+    # most texts have nothing to format
+    return template.format_map(format_kwargs) if format_kwargs else template